@@ -0,0 +1,48 @@
+from __future__ import annotations
+import asyncio
+import os
+import aiohttp
+from src.chat_request import chat_request_body
+from src.config import HTTP_MAX_CONNECTIONS, HTTP_TIMEOUT
+from src.schemas import RentalSchema
+
+CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+
+def new_session() -> aiohttp.ClientSession:
+    """
+    Creates a pooled aiohttp session authenticated with OPENAI_API_KEY.
+    
+    One session should be shared by every request in a run so connections
+    are reused.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=HTTP_MAX_CONNECTIONS),
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        headers={"Authorization": f"Bearer {os.environ['OPENAI_API_KEY']}"},
+    )
+
+def is_transient_aiohttp_error(exc: BaseException) -> bool:
+    """Checks whether a failure is a rate limit, server error, timeout or connection failure."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+async def aiohttp_extract(session: aiohttp.ClientSession, text: str) -> RentalSchema:
+    """
+    Extract rental schema fields from text by calling the API directly.
+    
+    Bypasses the OpenAI client and instructor, trading their per-call
+    overhead for a plain POST and a single pydantic validation. Makes a
+    single attempt; transient errors are retried by the pipeline.
+
+    Args:
+        session: Session from new_session
+        text: Input text to extract rental information from
+
+    Returns:
+        RentalSchema: Extracted rental data
+    """
+    async with session.post(CHAT_COMPLETIONS_URL, json=chat_request_body(text)) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+    return RentalSchema.model_validate_json(data["choices"][0]["message"]["content"])
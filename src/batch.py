@@ -0,0 +1,136 @@
+from __future__ import annotations
+import asyncio
+import io
+import json
+import logging
+from typing import Iterable, Union
+from openai import AsyncOpenAI
+from src.chat_request import chat_request_body
+from src.schemas import RentalSchema
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses after which the batch will no longer change
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Batch API limit on requests per input file
+MAX_BATCH_REQUESTS = 50_000
+
+BatchResult = Union[RentalSchema, BaseException]
+
+def _custom_id(idx: int) -> str:
+    return f"listing-{idx}"
+
+def build_batch_jsonl(listings: Iterable[tuple[int, str]]) -> bytes:
+    """
+    Serializes listings into Batch API request lines.
+    
+    Each line wraps a chat_request_body. Custom ids carry the listing's id in
+    the pipeline output, so results map back even when only some listings are submitted.
+
+    Args:
+        listings: Iterable of (id, text) pairs
+
+    Returns:
+        bytes: JSONL payload ready to upload
+    """
+    lines = []
+    for idx, text in listings:
+        lines.append(json.dumps({
+            "custom_id": _custom_id(idx),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": chat_request_body(text),
+        }, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+async def submit_batch(client: AsyncOpenAI, listings: Iterable[tuple[int, str]]) -> str:
+    """
+    Uploads listings as a batch input file and creates the batch.
+    
+    Callers must keep each batch within MAX_BATCH_REQUESTS listings.
+
+    Args:
+        client: Plain (not instructor-wrapped) AsyncOpenAI client
+        listings: Iterable of (id, text) pairs
+
+    Returns:
+        str: Id of the created batch
+    """
+    payload = io.BytesIO(build_batch_jsonl(listings))
+    input_file = await client.files.create(file=("listings.jsonl", payload), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+async def await_batch(client: AsyncOpenAI, batch_id: str, poll_interval: float = 30.0):
+    """
+    Polls a batch until it reaches a terminal status.
+    
+    Batches that end in any status other than completed are logged as a
+    warning together with their batch-level errors.
+
+    Args:
+        client: Plain AsyncOpenAI client
+        batch_id: Id returned by submit_batch
+        poll_interval: Seconds to wait between status checks
+
+    Returns:
+        Batch: The batch object in its final state
+    """
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            break
+        await asyncio.sleep(poll_interval)
+
+    if batch.status != "completed":
+        logger.warning("Batch %s ended with status %s: %s", batch_id, batch.status, batch.errors)
+    return batch
+
+def _parse_row(row: dict) -> BatchResult:
+    response = row.get("response") or {}
+    if row.get("error") or response.get("status_code") != 200:
+        return RuntimeError(f"Batch request failed: {row.get('error') or response}")
+    try:
+        message = response["body"]["choices"][0]["message"]["content"]
+        return RentalSchema.model_validate_json(message)
+    except Exception as exc:
+        return exc
+
+async def parse_batch_output(client: AsyncOpenAI, batch, ids: Iterable[int]) -> dict[int, BatchResult]:
+    """
+    Downloads a batch's output and error files and parses each line into a RentalSchema.
+    
+    Batch output lines are not ordered, so results are keyed by listing id.
+    Listings with no line in either file, a failed request, or an unparseable
+    response get an exception instead of a schema.
+
+    Args:
+        client: Plain AsyncOpenAI client
+        batch: Batch object returned by await_batch
+        ids: Ids of the listings submitted in this batch
+
+    Returns:
+        dict[int, BatchResult]: One schema or exception per submitted listing id
+    """
+    results: dict[int, BatchResult] = {
+        idx: RuntimeError(f"No batch output for {_custom_id(idx)} (batch status: {batch.status})")
+        for idx in ids
+    }
+
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id is None:
+            continue
+        content = await client.files.content(file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            idx = int(row["custom_id"].rsplit("-", 1)[1])
+            if idx in results:
+                results[idx] = _parse_row(row)
+    return results
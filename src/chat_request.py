@@ -0,0 +1,68 @@
+from __future__ import annotations
+from src.config import MODEL, SYSTEM_PROMPT
+from src.schemas import RentalSchema
+
+def _strict_schema(node, defs: dict):
+    """
+    Rewrites a pydantic JSON schema into the subset accepted by strict structured outputs.
+    
+    Every object gets additionalProperties=false and lists all of its properties
+    as required (optional fields stay nullable), "default" keywords are dropped,
+    and a $ref with sibling keywords is inlined because strict mode rejects that
+    combination.
+    """
+    if isinstance(node, list):
+        return [_strict_schema(item, defs) for item in node]
+    if not isinstance(node, dict):
+        return node
+
+    if "$ref" in node and len(node) > 1:
+        resolved = defs[node["$ref"].rsplit("/", 1)[-1]]
+        node = {**resolved, **{k: v for k, v in node.items() if k != "$ref"}}
+
+    out = {}
+    for key, value in node.items():
+        if key == "default":
+            continue
+        if key in ("properties", "$defs"):
+            # Mappings of names to schemas; the names themselves are kept as-is
+            out[key] = {name: _strict_schema(sub, defs) for name, sub in value.items()}
+        else:
+            out[key] = _strict_schema(value, defs)
+
+    if out.get("type") == "object" and "properties" in out:
+        out["additionalProperties"] = False
+        out["required"] = list(out["properties"])
+    return out
+
+def _response_format() -> dict:
+    schema = RentalSchema.model_json_schema()
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "RentalSchema",
+            "schema": _strict_schema(schema, schema.get("$defs", {})),
+            "strict": True,
+        },
+    }
+
+# Strict structured-output format, so replies are validated against RentalSchema server-side.
+# Built once at import rather than per request.
+RESPONSE_FORMAT = _response_format()
+
+def chat_request_body(text: str) -> dict:
+    """
+    Builds a raw /v1/chat/completions request body for one listing.
+    
+    The response format is the strict JSON schema of RentalSchema, so the reply
+    can be parsed with RentalSchema.model_validate_json without going through instructor.
+    Used by the batch and aiohttp backends.
+    """
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text}
+        ],
+        "response_format": RESPONSE_FORMAT,
+    }
@@ -30,4 +30,20 @@ class BedroomsRange:
 @dataclass(frozen=True)
 class BathroomsRange:
     min: int = 1
-    max: int = 10
\ No newline at end of file
+    max: int = 10
+
+
+# Shared default instances; the dataclasses are frozen, so one of each is safe to reuse
+DEFAULT_CONF = ConfidenceThresholds()
+DEFAULT_PRICE_POLICY = PricePolicy()
+DEFAULT_BEDS = BedroomsRange()
+DEFAULT_BATHS = BathroomsRange()
+
+# Extraction settings shared by the interactive and batch pipelines
+MODEL = "gpt-5-nano"
+SYSTEM_PROMPT = "Extract the fields defined in the schema from the text."
+PROMPT_VERSION = "v1"  # bump when SYSTEM_PROMPT or RentalSchema changes to invalidate cached responses
+
+# HTTP connection pool settings for the extraction clients
+HTTP_MAX_CONNECTIONS = 200
+HTTP_TIMEOUT = 60.0  # seconds
\ No newline at end of file
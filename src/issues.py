@@ -1,16 +1,24 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field as dataclass_field
+from operator import attrgetter
 
 SEVERITY_RANK  = {"error": 2, "warning": 1}
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Issue:
     field: str
     severity: str
     message: str
+    rank: int = dataclass_field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Resolve severity to its sort rank once, at construction
+        object.__setattr__(self, "rank", SEVERITY_RANK.get(self.severity, 0))
     
+_RANK_GETTER = attrgetter("rank")
+
 def is_valid(issues: list[Issue]) -> bool:
-    return all(i.severity != "error" for i in issues)
+    return not any(i.severity == "error" for i in issues)
 
 def sort_issues(issues: list[Issue]) -> list[Issue]:
-    return sorted(issues, key=lambda i: SEVERITY_RANK.get(i.severity, 0), reverse=True)
\ No newline at end of file
+    return sorted(issues, key=_RANK_GETTER, reverse=True)
\ No newline at end of file
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Optional
+from src.config import MODEL, PROMPT_VERSION
+
+DEFAULT_PATH = os.path.join("data", "llm_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds
+
+_conn: Optional[sqlite3.Connection] = None
+
+def _connect() -> sqlite3.Connection:
+    """Opens the cache database on first use and creates the table if needed."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(DEFAULT_PATH), exist_ok=True)
+        _conn = sqlite3.connect(DEFAULT_PATH)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "hash TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, "
+            "response TEXT, created_at INT, expires_at INT)"
+        )
+    return _conn
+
+def cache_key(text: str, backend: str) -> str:
+    """
+    Builds the content-addressed key for a listing.
+    
+    The key covers the model, prompt version and backend, so changing any of
+    them misses the cache instead of returning stale extractions. Backends
+    send different requests (instructor's tool call vs. a json_schema response
+    format), so their responses are cached separately.
+    """
+    return hashlib.sha256(f"{MODEL}|{PROMPT_VERSION}|{backend}|{text}".encode("utf-8")).hexdigest()
+
+def get(key: str) -> Optional[str]:
+    """Returns the cached response JSON for key, or None if missing or expired."""
+    row = _connect().execute(
+        "SELECT response FROM cache WHERE hash = ? AND expires_at > ?",
+        (key, int(time.time()))
+    ).fetchone()
+    return row[0] if row else None
+
+def set(key: str, json_str: str, ttl: int = DEFAULT_TTL) -> None:
+    """Stores a response JSON under key, replacing any previous entry."""
+    now = int(time.time())
+    conn = _connect()
+    conn.execute(
+        "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+        (key, MODEL, PROMPT_VERSION, json_str, now, now + ttl)
+    )
+    conn.commit()
@@ -1,89 +1,503 @@
-import json
-from typing import Iterable
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
+import weakref
+from functools import partial
+from typing import Iterable, Iterator, Optional
+import openai
+from openai import AsyncOpenAI
+from aiolimiter import AsyncLimiter
+import httpx
 import instructor
+import orjson
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception
+from src import llm_cache
+from src.aiohttp_backend import new_session, aiohttp_extract, is_transient_aiohttp_error
+from src.batch import submit_batch, await_batch, parse_batch_output, MAX_BATCH_REQUESTS
+from src.config import MODEL, SYSTEM_PROMPT, HTTP_MAX_CONNECTIONS, HTTP_TIMEOUT
 from src.schemas import RentalSchema
 from src.validation import validate_rental
-from src.issues import sort_issues, is_valid
+from src.issues import sort_issues
 from dotenv import load_dotenv
 import argparse
 import os
 load_dotenv()
 
-def extract_one(client, text: str) -> RentalSchema:
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 50  # log progress after this many completed listings
+
+# Backoff for transient API errors; the pipeline is the only retry layer
+RETRY_ATTEMPTS = 3
+RETRY_WAIT = wait_random_exponential(min=1, max=20)
+
+TRANSIENT_OPENAI_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)
+
+def is_transient_openai_error(exc: BaseException) -> bool:
+    """
+    Checks whether an extraction failure is worth retrying.
+    
+    Instructor re-raises API errors as InstructorRetryException, so the
+    original openai error is looked up on __cause__ as well.
+    """
+    return isinstance(exc, TRANSIENT_OPENAI_ERRORS) or isinstance(exc.__cause__, TRANSIENT_OPENAI_ERRORS)
+
+async def extract_one(client, text: str) -> RentalSchema:
     """
     Extract rental schema fields from text using GPT.
     
+    Makes a single attempt; transient errors are retried by the pipeline.
+    
     Args:
-        client: Instructor-wrapped OpenAI client
+        client: Instructor-wrapped AsyncOpenAI client
         text: Input text to extract rental information from
         
     Returns:
         RentalSchema: Extracted rental data
     """
-    return client.chat.completions.create(
-        model="gpt-5-nano",
+    return await client.chat.completions.create(
+        model=MODEL,
+        # Fresh dicts per call: instructor's JSON modes append the schema to the system message in place
         messages=[
-            {"role": "system", "content": "Extract the fields defined in the schema from the text."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": text}
         ],
-        response_model=RentalSchema
+        response_model=RentalSchema,
+        # instructor 1.17 counts retries after the first attempt (stop_after_attempt(max_retries + 1)),
+        # so 0 means one HTTP request per call and no reask that would bypass the RPM limiter
+        max_retries=0,
     )
     
-def run_pipeline(texts: Iterable[str]) -> list[dict]:
+def new_openai_client() -> AsyncOpenAI:
+    """
+    Creates an AsyncOpenAI client backed by a large shared connection pool.
+    
+    The default httpx pool is sized for light use; at high concurrency requests
+    queue for connections, so the pool is widened to match the pipeline.
+    SDK-level retries are disabled because the pipeline retries transient errors.
+    """
+    return AsyncOpenAI(max_retries=0, http_client=httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT),
+    ))
+
+# One client per event loop: an httpx pool cannot be reused once its loop closes
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, instructor.AsyncInstructor]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def get_client() -> instructor.AsyncInstructor:
+    """
+    Returns the instructor-wrapped client for the running event loop, creating it on first use.
+    
+    Repeated run_pipeline calls on the same loop share one connection pool;
+    each new loop (e.g. every asyncio.run) gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = instructor.from_openai(new_openai_client())
+    return client
+
+async def run_pipeline(
+    texts: Iterable[str],
+    out_path: str,
+    max_concurrency: int = 20,
+    max_rpm: Optional[int] = None,
+    use_cache: bool = True,
+    resume: bool = True,
+    trust_cache: bool = True,
+    aiohttp_backend: bool = False,
+    client: Optional[instructor.AsyncInstructor] = None,
+) -> dict[str, int]:
     """
     Process multiple rental listing texts through extraction and validation pipeline.
     
+    Extraction requests are issued through a sliding window of at most
+    max_concurrency tasks and optionally a requests-per-minute limiter. Each result is validated and
+    appended to the JSONL output as soon as its request finishes, so nothing
+    is held in memory and a crash keeps everything written so far. Listings
+    already in the on-disk cache skip the API (and the limits) entirely.
+    When resuming, the output is first compacted to one successful record
+    per id, listings already recorded there are skipped, and new records are
+    appended.
+    
     Args:
         texts: Iterable of rental listing texts
+        out_path: Path to the JSONL output file
+        max_concurrency: Maximum number of requests in flight at once
+        max_rpm: Maximum requests per minute, or None for no rate limit
+        use_cache: Whether to read and write the on-disk response cache
+        resume: Whether to skip listings already in the output instead of overwriting it
+        trust_cache: Whether to load cache hits without re-running pydantic validation
+        aiohttp_backend: Whether to call the API directly over aiohttp instead of
+            through the instructor-wrapped OpenAI client
+        client: Instructor-wrapped AsyncOpenAI client; defaults to get_client()
         
     Returns:
-        list[dict]: List of results with extracted data and validation issues
+        dict[str, int]: Counts of total, valid, with-issues, and skipped results
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    if max_rpm is not None and max_rpm < 1:
+        raise ValueError(f"max_rpm must be at least 1 or None, got {max_rpm}")
+    if aiohttp_backend:
+        async with new_session() as session:
+            return await _run_extraction(
+                partial(aiohttp_extract, session), is_transient_aiohttp_error, "aiohttp",
+                texts, out_path, max_concurrency, max_rpm, use_cache, resume, trust_cache
+            )
+    return await _run_extraction(
+        partial(extract_one, client or get_client()), is_transient_openai_error, "instructor",
+        texts, out_path, max_concurrency, max_rpm, use_cache, resume, trust_cache
+    )
+
+async def _run_extraction(
+    request,
+    is_transient,
+    backend: str,
+    texts: Iterable[str],
+    out_path: str,
+    max_concurrency: int,
+    max_rpm: Optional[int],
+    use_cache: bool,
+    resume: bool,
+    trust_cache: bool,
+) -> dict[str, int]:
     """
-    client = instructor.from_openai(OpenAI())
-    results: list[dict] = []
+    Runs the concurrent extract-validate-write loop for run_pipeline.
     
-    # Process each text and collect results
-    for idx, text in enumerate(texts, start=1):
-        schema = extract_one(client, text)
-        issues = sort_issues(validate_rental(schema))
-        results.append({
+    request(text) performs one extraction attempt; failures for which
+    is_transient(exc) is true are retried with jittered exponential backoff.
+    backend names the request path and is part of the cache key.
+    """
+    limiter = AsyncLimiter(max_rpm, 60) if max_rpm is not None else None
+    
+    async def _attempt(text: str) -> RentalSchema:
+        # Every HTTP attempt, including retries, counts against max_rpm
+        if limiter is not None:
+            await limiter.acquire()
+        return await request(text)
+    
+    async def _extract(text: str) -> RentalSchema:
+        key = llm_cache.cache_key(text, backend)
+        if use_cache:
+            cached = llm_cache.get(key)
+            if cached is not None:
+                return schema_from_cache(cached, trust_cache)
+        
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(RETRY_ATTEMPTS),
+            wait=RETRY_WAIT,
+            retry=retry_if_exception(is_transient),
+            reraise=True,
+        )
+        schema = await retrying(_attempt, text)
+        
+        if use_cache:
+            llm_cache.set(key, schema.model_dump_json())
+        return schema
+    
+    async def _one(idx: int, text: str) -> dict:
+        # Failures, including validation of a stale cached schema, become
+        # error records instead of aborting the run
+        try:
+            return build_result(idx, text, await _extract(text))
+        except Exception as exc:
+            return build_result(idx, text, exc)
+    
+    stats = new_stats()
+    # Compact the checkpoint before opening the output; it replaces the file
+    done_ids = load_done_ids(out_path) if resume else {}
+    listings = pending_listings(texts, done_ids, out_path, stats)
+    in_flight: set[asyncio.Task] = set()
+    
+    def _submit_next() -> None:
+        listing = next(listings, None)
+        if listing is not None:
+            in_flight.add(asyncio.create_task(_one(*listing)))
+    
+    # Sliding window: keep at most max_concurrency tasks alive and start a new
+    # one as each finishes, so memory stays O(max_concurrency) for any input size
+    with open_output(out_path, resume) as f:
+        try:
+            for _ in range(max_concurrency):
+                _submit_next()
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    in_flight.discard(task)
+                    write_result(f, task.result(), stats)
+                    if stats["total"] % PROGRESS_EVERY == 0:
+                        logger.info("%d listings done (%d skipped)", stats["total"], stats["skipped"])
+                    _submit_next()
+        finally:
+            # Don't leave requests running if the loop exits early
+            for task in in_flight:
+                task.cancel()
+    return stats
+
+async def run_batch_pipeline(
+    texts: Iterable[str],
+    out_path: str,
+    poll_interval: float = 30.0,
+    resume: bool = True,
+) -> dict[str, int]:
+    """
+    Process rental listing texts through the OpenAI Batch API.
+    
+    Suited to large offline runs: requests are billed at the batch rate and
+    draw from a separate rate-limit pool, at the cost of waiting (up to 24h)
+    for the batch to complete. Listings are split into batches of at most
+    MAX_BATCH_REQUESTS, which are all submitted before any is awaited.
+    
+    Args:
+        texts: Iterable of rental listing texts
+        out_path: Path to the JSONL output file
+        poll_interval: Seconds to wait between batch status checks
+        resume: Whether to skip listings already in the output instead of overwriting it
+        
+    Returns:
+        dict[str, int]: Counts of total, valid, with-issues, and skipped results
+    """
+    client = AsyncOpenAI()
+    stats = new_stats()
+    done_ids = load_done_ids(out_path) if resume else {}
+    pending = list(pending_listings(texts, done_ids, out_path, stats))
+    if not pending:
+        return stats
+    
+    chunks = [pending[i:i + MAX_BATCH_REQUESTS] for i in range(0, len(pending), MAX_BATCH_REQUESTS)]
+    batch_ids = [await submit_batch(client, chunk) for chunk in chunks]
+    
+    with open_output(out_path, resume) as f:
+        for chunk, batch_id in zip(chunks, batch_ids):
+            batch = await await_batch(client, batch_id, poll_interval)
+            schemas = await parse_batch_output(client, batch, [idx for idx, _ in chunk])
+            for idx, text in chunk:
+                write_result(f, build_result(idx, text, schemas[idx]), stats)
+    return stats
+
+def schema_from_cache(cached: str, trusted: bool) -> RentalSchema:
+    """
+    Rebuilds a RentalSchema from cached JSON.
+    
+    The cache only holds responses that already passed validation, so trusted
+    entries are rebuilt with model_construct, skipping validation and coercion.
+    Untrusted entries are fully re-validated.
+
+    Args:
+        cached: JSON written by RentalSchema.model_dump_json
+        trusted: Whether to skip validation
+
+    Returns:
+        RentalSchema: The cached extraction
+    """
+    if not trusted:
+        return RentalSchema.model_validate_json(cached)
+    data = orjson.loads(cached)
+    fields = RentalSchema.model_fields
+    return RentalSchema.model_construct(**{
+        name: fields[name].annotation.model_construct(**value) for name, value in data.items()
+    })
+
+def build_result(idx: int, text: str, schema) -> dict:
+    """
+    Validate an extracted schema and assemble its result record.
+    
+    Args:
+        idx: 1-based position of the listing in the input
+        text: Rental listing text
+        schema: Extracted RentalSchema, or the exception raised extracting it
+        
+    Returns:
+        dict: Result with extracted data and validation issues
+    """
+    if isinstance(schema, BaseException):
+        logger.warning("Listing %d failed: %r", idx, schema)
+        return {
             "id": idx,
             "text": text,
-            "valid": is_valid(issues),
-            "issues": [i.__dict__ for i in issues],
-            "extracted": schema.model_dump(),
-        })
-        
-    return results
+            "valid": False,
+            "issues": [],
+            "extracted": None,
+            "error": repr(schema),
+        }
+    issues = sort_issues(validate_rental(schema))
+    return {
+        "id": idx,
+        "text": text,
+        # Errors sort first, so only the head needs checking
+        "valid": not issues or issues[0].severity != "error",
+        "issues": [{"field": i.field, "severity": i.severity, "message": i.message} for i in issues],
+        "extracted": schema.model_dump(),
+    }
 
-def load_listings_from_txt(path: str) -> list[str]:
-    """  
-    Loads listings from a text file.
-    Listings are seperated by one or more lines
+def new_stats() -> dict[str, int]:
+    """Returns zeroed summary counters for a pipeline run."""
+    return {"total": 0, "valid": 0, "with_issues": 0, "skipped": 0}
+
+def listing_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def load_done_ids(path: str) -> dict[int, str]:
+    """
+    Compacts a JSONL output for resuming and returns the listings it already covers.
+    
+    The file is rewritten to keep only the last successful record for each id.
+    Error records are dropped because those listings are retried (and get a
+    fresh record) on this run; truncated lines from a crash are dropped too.
+    The result is at most one record per id.
+
+    Args:
+        path: Path to a JSONL output file written by the pipeline
+
+    Returns:
+        dict[int, str]: Listing id -> SHA-256 hash of its text, for completed listings
     """
+    done: dict[int, str] = {}
+    keep: dict[int, int] = {}  # id -> line number of its last successful record
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f):
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done[record["id"]] = listing_hash(record["text"])
+                keep[record["id"]] = lineno
+
+    keep_lines = set(keep.values())
+    tmp_path = path + ".tmp"
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        for lineno, line in enumerate(src):
+            if lineno in keep_lines:
+                dst.write(line if line.endswith(b"\n") else line + b"\n")
+    os.replace(tmp_path, path)
+    return done
+
+def pending_listings(
+    texts: Iterable[str],
+    done: dict[int, str],
+    out_path: str,
+    stats: dict[str, int],
+) -> Iterator[tuple[int, str]]:
+    """
+    Numbers listings from 1 and lazily drops those already in done.
+    
+    done comes from load_done_ids, which must run before out_path is opened
+    for writing because it rewrites the file. A listing is done only if
+    out_path has a successful record with the same id and text. If an id holds
+    a different text, out_path was written from another input; this is logged
+    as a warning because records from the two inputs would share ids.
+    """
+    warned = False
+    for idx, text in enumerate(texts, start=1):
+        recorded = done.get(idx)
+        if recorded is None:
+            yield idx, text
+        elif recorded == listing_hash(text):
+            stats["skipped"] += 1
+        else:
+            if not warned:
+                logger.warning(
+                    "%s holds a different listing with id %d; it was written from another input. "
+                    "Records from both inputs will share ids. Use --force or a different --out.",
+                    out_path, idx,
+                )
+                warned = True
+            yield idx, text
+
+def open_output(path: str, append: bool):
+    """Opens the JSONL output file in binary mode, creating its directory if needed."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if not append:
+        return open(path, "wb")
+    
+    f = open(path, "ab+")
+    # Terminate a partial last line left by a crash so new records start cleanly
+    if f.tell() > 0:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+    return f
+
+def write_result(f, record: dict, stats: dict[str, int]) -> None:
+    """Appends one result as a JSONL line and updates the running counts."""
+    f.write(orjson.dumps(record) + b"\n")
+    f.flush()
+    stats["total"] += 1
+    stats["valid"] += record["valid"]
+    stats["with_issues"] += len(record["issues"]) > 0
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+def iter_listings_from_txt(path: str) -> Iterator[str]:
+    """
+    Streams listings from a text file.
+    Listings are separated by one or more blank lines. The file is read line by
+    line, so memory use is bounded by the largest listing rather than the file.
+    """
+    buf: list[str] = []
     with open(path, "r", encoding="utf-8") as f:
-        raw = f.read()
-        
-    listings = [block.strip() for block in raw.split("\n\n") if block.strip()]
-    return listings
+        for line in f:
+            stripped = line.strip()
+            if stripped:
+                buf.append(stripped)
+            elif buf:
+                yield "\n".join(buf)
+                buf.clear()
+    if buf:
+        yield "\n".join(buf)
+
+def load_listings_from_txt(path: str) -> list[str]:
+    """Loads all listings from a text file into a list."""
+    return list(iter_listings_from_txt(path))
     
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="LLM extraction + deterministic validation pipeline")
     parser.add_argument("--in", dest="in_path", default=os.path.join("examples", "listings.txt"),
                         help="Path to input .txt file (listings separated by blank lines)")
-    parser.add_argument("--out", dest="out_path", default=os.path.join("out", "out.json"),
-                        help="Path to output JSON file")
+    parser.add_argument("--out", dest="out_path", default=os.path.join("out", "out.jsonl"),
+                        help="Path to output JSONL file (one result per line)")
+    parser.add_argument("--max-concurrency", dest="max_concurrency", type=positive_int, default=20,
+                        help="Maximum number of extraction requests in flight at once")
+    parser.add_argument("--max-rpm", dest="max_rpm", type=positive_int, default=None,
+                        help="Maximum extraction requests per minute (default: unlimited)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--trust-cache", dest="trust_cache", action=argparse.BooleanOptionalAction, default=True,
+                        help="Load cached responses without re-validating them (default: on)")
+    parser.add_argument("--aiohttp-backend", dest="aiohttp_backend", action="store_true",
+                        help="Call the chat completions endpoint directly over aiohttp")
+    parser.add_argument("--force", dest="resume", action="store_false",
+                        help="Reprocess every listing and overwrite --out instead of resuming from it")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit listings via the OpenAI Batch API instead of interactive requests")
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-    texts = load_listings_from_txt(args.in_path)
-    out = run_pipeline(texts)
-
-    os.makedirs(os.path.dirname(args.out_path), exist_ok=True)
-    with open(args.out_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2, ensure_ascii=False)
+    texts = iter_listings_from_txt(args.in_path)
+    if args.batch:
+        stats = asyncio.run(run_batch_pipeline(texts, args.out_path, resume=args.resume))
+    else:
+        stats = asyncio.run(run_pipeline(
+            texts, args.out_path, args.max_concurrency, args.max_rpm,
+            args.use_cache, args.resume, args.trust_cache, args.aiohttp_backend
+        ))
 
     print(f"Wrote {args.out_path}")
-    print("Total listings:", len(out))
-    print("Valid:", sum(1 for r in out if r["valid"]))
-    print("With issues:", sum(1 for r in out if len(r["issues"]) > 0))
\ No newline at end of file
+    print("Processed listings:", stats["total"])
+    print("Valid:", stats["valid"])
+    print("With issues:", stats["with_issues"])
+    print("Skipped (already done):", stats["skipped"])
@@ -1,12 +1,52 @@
 from __future__ import annotations
 from src.schemas import RentalSchema
-from src.config import ConfidenceThresholds, PricePolicy, BedroomsRange, BathroomsRange
+from src.config import (
+    ConfidenceThresholds, PricePolicy, BedroomsRange, BathroomsRange,
+    DEFAULT_CONF, DEFAULT_PRICE_POLICY, DEFAULT_BEDS, DEFAULT_BATHS,
+)
 from src.issues import Issue
 
+def _check_confidence(
+    issues: list[Issue],
+    c: float,
+    field_name: str,
+    conf: ConfidenceThresholds
+) -> None:
+    """Appends an error or warning to issues if confidence c is below the thresholds."""
+    if c < conf.error:
+        # Confidence below error threshold
+        issues.append(Issue(
+            field=field_name,
+            severity="error",
+            message=(f"Error-level confidence ({c:.2f} < {conf.error}); manual review required.")
+        ))
+    elif c < conf.warn:
+        # Confidence below warning threshold
+        issues.append(Issue(
+            field=field_name,
+            severity="warning",
+            message=(f"Low confidence ({c:.2f} < {conf.warn}); manual review recommended.")
+        ))
+
+def _check_range(
+    issues: list[Issue],
+    v: float,
+    field_name: str,
+    min_v: float,
+    max_v: float
+) -> None:
+    """Appends an error to issues if value v is outside [min_v, max_v]."""
+    if v < min_v or v > max_v:
+        issues.append(Issue(
+            field=field_name,
+            severity="error",
+            message=f"{field_name} {v} is outside expected range [{min_v}, {max_v}]."
+        ))
+
 def validate_confidence(
     extracted_field,
     field_name: str,
-    conf: ConfidenceThresholds = ConfidenceThresholds()
+    conf: ConfidenceThresholds = DEFAULT_CONF
 ) -> list[Issue]:
     """
     Validates extracted field confidence against configured thresholds.
@@ -18,7 +58,7 @@ def validate_confidence(
         extracted_field: The specific field to validate
         field_name (str): The name of the field
         conf (ConfidenceThresholds, optional): Configured confidence thresholds. 
-            Defaults to ConfidenceThresholds().
+            Defaults to DEFAULT_CONF.
 
     Returns:
         list[Issue]: List of issues related to confidence validation
@@ -30,21 +70,7 @@ def validate_confidence(
         return issues
 
     # Check confidence level against thresholds
-    c = extracted_field.confidence
-    if c < conf.error:
-        # Confidence below error threshold
-        issues.append(Issue(
-            field=field_name,
-            severity="error",
-            message=(f"Error-level confidence ({c:.2f} < {conf.error}); manual review required.")
-        ))
-    elif c < conf.warn:
-        # Confidence below warning threshold
-        issues.append(Issue(
-            field=field_name,
-            severity="warning",
-            message=(f"Low confidence ({c:.2f} < {conf.warn}); manual review recommended.")
-        ))
+    _check_confidence(issues, extracted_field.confidence, field_name, conf)
     return issues
 
 def validate_range(
@@ -72,13 +98,30 @@ def validate_range(
         return issues
     
     # Check if value is within acceptable range
+    _check_range(issues, extracted_field.value, field_name, min_v, max_v)
+    return issues
+
+
+def _validate_numeric(
+    extracted_field,
+    field_name: str,
+    min_v: float,
+    max_v: float,
+    conf: ConfidenceThresholds
+) -> list[Issue]:
+    """
+    Runs the range and confidence checks for a numeric field in one pass.
+    
+    Equivalent to validate_range followed by validate_confidence, with a single
+    missing-value check and a single issue list.
+    """
+    issues: list[Issue] = []
     v = extracted_field.value
-    if v < min_v or v > max_v:
-        issues.append(Issue(
-            field=field_name,
-            severity="error",
-            message=f"{field_name} {v} is outside expected range [{min_v}, {max_v}]."
-        ))
+    if v is None:
+        return issues
+
+    _check_range(issues, v, field_name, min_v, max_v)
+    _check_confidence(issues, extracted_field.confidence, field_name, conf)
     return issues
 
 
@@ -87,45 +130,33 @@ def validate_range(
 def validate_price(
     price_field,
     bedrooms_value: int | None,
-    conf: ConfidenceThresholds = ConfidenceThresholds(),
-    policy: PricePolicy = PricePolicy(),
+    conf: ConfidenceThresholds = DEFAULT_CONF,
+    policy: PricePolicy = DEFAULT_PRICE_POLICY,
 ) -> list[Issue]:
-    issues: list[Issue] = []
-    if price_field.value is None:
-        return issues
-
+    """Validates monthly price against the bedroom-dependent range and confidence thresholds."""
     max_p = policy.max_for_bedrooms(bedrooms_value)
-
-    issues.extend(validate_range(price_field, "price_monthly", policy.min_price, max_p))
-    issues.extend(validate_confidence(price_field, "price_monthly", conf))
-    return issues
+    return _validate_numeric(price_field, "price_monthly", policy.min_price, max_p, conf)
 
 def validate_bedrooms(
     beds_field,
-    conf: ConfidenceThresholds = ConfidenceThresholds(),
-    beds_range: BedroomsRange = BedroomsRange(),
+    conf: ConfidenceThresholds = DEFAULT_CONF,
+    beds_range: BedroomsRange = DEFAULT_BEDS,
 ) -> list[Issue]:
     """Validates bedroom count field against range and confidence thresholds."""
-    issues: list[Issue] = []
-    issues.extend(validate_range(beds_field, "bedrooms", beds_range.min, beds_range.max))
-    issues.extend(validate_confidence(beds_field, "bedrooms", conf))
-    return issues
+    return _validate_numeric(beds_field, "bedrooms", beds_range.min, beds_range.max, conf)
 
 def validate_bathrooms(
     baths_field,
-    conf: ConfidenceThresholds = ConfidenceThresholds(),
-    baths_range: BathroomsRange = BathroomsRange(),
+    conf: ConfidenceThresholds = DEFAULT_CONF,
+    baths_range: BathroomsRange = DEFAULT_BATHS,
 ) -> list[Issue]:
     """Validates bathroom count field against range and confidence thresholds."""
-    issues: list[Issue] = []
-    issues.extend(validate_range(baths_field, "bathrooms", baths_range.min, baths_range.max))
-    issues.extend(validate_confidence(baths_field, "bathrooms", conf))
-    return issues
+    return _validate_numeric(baths_field, "bathrooms", baths_range.min, baths_range.max, conf)
     
 def validate_string_field(
     string_field,
     field_name: str,
-    conf: ConfidenceThresholds = ConfidenceThresholds()
+    conf: ConfidenceThresholds = DEFAULT_CONF
 ) -> list[Issue]:
     """
     Validates string field against confidence thresholds.
@@ -136,7 +167,7 @@ def validate_string_field(
         string_field: The string field to validate
         field_name (str): The name of the field
         conf (ConfidenceThresholds, optional): Confidence thresholds. 
-            Defaults to ConfidenceThresholds().
+            Defaults to DEFAULT_CONF.
     
     Returns:
         list[Issue]: List of confidence-related issues
@@ -145,9 +176,9 @@ def validate_string_field(
 
 def validate_rental(
     schema: RentalSchema,
-    conf: ConfidenceThresholds = ConfidenceThresholds(),
-    beds_range: BedroomsRange = BedroomsRange(),
-    baths_range: BathroomsRange = BathroomsRange()
+    conf: ConfidenceThresholds = DEFAULT_CONF,
+    beds_range: BedroomsRange = DEFAULT_BEDS,
+    baths_range: BathroomsRange = DEFAULT_BATHS
 ) -> list[Issue]:
     """
     Validates entire rental listing schema.
@@ -157,13 +188,13 @@ def validate_rental(
     Args:
         schema (RentalSchema): The extracted rental data to validate
         conf (ConfidenceThresholds, optional): Confidence thresholds. 
-            Defaults to ConfidenceThresholds().
+            Defaults to DEFAULT_CONF.
         price_range (PriceRange, optional): Valid price range. 
             Defaults to PriceRange().
         beds_range (BedroomsRange, optional): Valid bedroom count range. 
-            Defaults to BedroomsRange().
+            Defaults to DEFAULT_BEDS.
         baths_range (BathroomsRange, optional): Valid bathroom count range. 
-            Defaults to BathroomsRange().
+            Defaults to DEFAULT_BATHS.
 
     Returns:
         list[Issue]: Aggregated list of all validation issues found
@@ -0,0 +1,42 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from src import batch
+
+def _reply(idx: int, content: dict) -> str:
+    return json.dumps({
+        "custom_id": f"listing-{idx}",
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": json.dumps(content)}}]}},
+        "error": None,
+    })
+
+def _failure(idx: int) -> str:
+    return json.dumps({
+        "custom_id": f"listing-{idx}",
+        "response": {"status_code": 400, "body": {"error": {"message": "bad request"}}},
+        "error": None,
+    })
+
+class FakeFiles:
+    def __init__(self, files: dict[str, str]):
+        self.files = files
+
+    async def content(self, file_id: str):
+        return SimpleNamespace(text=self.files[file_id])
+
+def test_custom_ids_use_listing_ids():
+    lines = batch.build_batch_jsonl([(4, "a"), (9, "b")]).decode().splitlines()
+
+    assert [json.loads(line)["custom_id"] for line in lines] == ["listing-4", "listing-9"]
+
+def test_parse_reads_output_and_error_files():
+    field = {"value": None, "evidence": None, "confidence": 0.0}
+    schema = {name: field for name in ("price_monthly", "bedrooms", "bathrooms", "address", "utilities_text")}
+    client = SimpleNamespace(files=FakeFiles({"out": _reply(4, schema), "err": _failure(9)}))
+    finished = SimpleNamespace(status="completed", output_file_id="out", error_file_id="err")
+
+    results = asyncio.run(batch.parse_batch_output(client, finished, [4, 9, 12]))
+
+    assert results[4].price_monthly.value is None
+    assert "bad request" in str(results[9])
+    assert "No batch output" in str(results[12])
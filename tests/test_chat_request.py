@@ -0,0 +1,28 @@
+from src.chat_request import chat_request_body
+
+def _schemas(node):
+    # Yields every sub-schema; property and $defs names are not schemas themselves
+    if isinstance(node, list):
+        for item in node:
+            yield from _schemas(item)
+    elif isinstance(node, dict):
+        yield node
+        for key, value in node.items():
+            if key in ("properties", "$defs"):
+                for sub in value.values():
+                    yield from _schemas(sub)
+            else:
+                yield from _schemas(value)
+
+def test_request_uses_strict_schema():
+    body = chat_request_body("Studio. $1200/mo.")
+    response_format = body["response_format"]["json_schema"]
+
+    assert response_format["strict"] is True
+    assert body["messages"][-1] == {"role": "user", "content": "Studio. $1200/mo."}
+    for schema in _schemas(response_format["schema"]):
+        assert "default" not in schema
+        assert "$ref" not in schema or len(schema) == 1
+        if schema.get("type") == "object":
+            assert schema["additionalProperties"] is False
+            assert set(schema["required"]) == set(schema["properties"])
@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+import httpx
+import openai
+import orjson
+import pytest
+from tenacity import wait_none
+from src import pipeline
+from src.schemas import RentalSchema
+
+def _schema() -> RentalSchema:
+    field = {"value": None, "evidence": None, "confidence": 0.0}
+    return RentalSchema(
+        price_monthly={"value": 1500, "evidence": "$1500/mo", "confidence": 1.0},
+        bedrooms={"value": 1, "evidence": "1 Bed", "confidence": 1.0},
+        bathrooms={"value": 1.0, "evidence": "1 Bath", "confidence": 1.0},
+        address=field,
+        utilities_text=field,
+    )
+
+def _wrapped_rate_limit() -> Exception:
+    # Stand-in for instructor's InstructorRetryException, which keeps the openai error on __cause__
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    cause = openai.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+    exc = RuntimeError("instructor gave up")
+    exc.__cause__ = cause
+    return exc
+
+class FakeCompletions:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.system_prompts = []
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        # Mimic instructor's JSON modes, which extend the system message in place
+        system = kwargs["messages"][0]
+        self.system_prompts.append(system["content"])
+        system["content"] += "\n<schema>"
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+def _fake_client(outcomes):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(outcomes)))
+
+def _run(client, out_path, **kwargs) -> dict:
+    return asyncio.run(pipeline.run_pipeline(
+        ["Mowat Avenue - 1 Bed, 1 Bath. $1500/mo."], str(out_path), use_cache=False, client=client, **kwargs
+    ))
+
+def _records(out_path) -> list[dict]:
+    return [orjson.loads(line) for line in out_path.read_bytes().splitlines()]
+
+def test_wrapped_rate_limit_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "RETRY_WAIT", wait_none())
+    client = _fake_client([_wrapped_rate_limit(), _schema()])
+    out_path = tmp_path / "out.jsonl"
+
+    stats = _run(client, out_path)
+
+    assert client.chat.completions.calls == 2
+    assert stats["valid"] == 1
+    assert "error" not in _records(out_path)[0]
+
+def test_non_transient_error_is_not_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "RETRY_WAIT", wait_none())
+    client = _fake_client([ValueError("bad response")])
+    out_path = tmp_path / "out.jsonl"
+
+    stats = _run(client, out_path)
+
+    assert client.chat.completions.calls == 1
+    assert stats["valid"] == 0
+    assert "ValueError" in _records(out_path)[0]["error"]
+
+def test_retries_count_against_rate_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "RETRY_WAIT", wait_none())
+    acquired = []
+
+    class CountingLimiter:
+        def __init__(self, *args):
+            pass
+
+        async def acquire(self):
+            acquired.append(1)
+
+    monkeypatch.setattr(pipeline, "AsyncLimiter", CountingLimiter)
+    client = _fake_client([_wrapped_rate_limit(), _schema()])
+
+    _run(client, tmp_path / "out.jsonl", max_rpm=60)
+
+    assert len(acquired) == 2
+
+def test_get_client_is_per_event_loop(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    async def _pair():
+        return pipeline.get_client(), pipeline.get_client()
+
+    first, again = asyncio.run(_pair())
+    second, _ = asyncio.run(_pair())
+
+    assert first is again
+    assert first is not second
+
+def test_resume_keeps_one_record_per_listing(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "RETRY_WAIT", wait_none())
+    out_path = tmp_path / "out.jsonl"
+
+    _run(_fake_client([ValueError("first failure")]), out_path)
+    _run(_fake_client([ValueError("second failure")]), out_path)
+    assert len(_records(out_path)) == 1
+
+    stats = _run(_fake_client([_schema()]), out_path)
+    records = _records(out_path)
+
+    assert stats["valid"] == 1
+    assert len(records) == 1
+    assert "error" not in records[0]
+
+    stats = _run(_fake_client([]), out_path)
+    assert stats["skipped"] == 1
+    assert len(_records(out_path)) == 1
+
+def test_rejects_non_positive_concurrency(tmp_path):
+    with pytest.raises(ValueError):
+        _run(_fake_client([]), tmp_path / "out.jsonl", max_concurrency=0)
+
+@pytest.mark.parametrize("max_rpm", [0, -5])
+def test_rejects_non_positive_rpm(tmp_path, max_rpm):
+    with pytest.raises(ValueError):
+        _run(_fake_client([]), tmp_path / "out.jsonl", max_rpm=max_rpm)
+
+def test_first_run_with_default_resume_writes_output(tmp_path):
+    out_path = tmp_path / "out.jsonl"
+
+    stats = _run(_fake_client([_schema()]), out_path)
+
+    assert stats["total"] == 1
+    assert len(_records(out_path)) == 1
+
+def test_invalid_schema_becomes_error_record(tmp_path):
+    # e.g. a trusted cache entry written before a schema change
+    out_path = tmp_path / "out.jsonl"
+
+    stats = _run(_fake_client([RentalSchema.model_construct()]), out_path)
+
+    assert stats["total"] == 1
+    assert "error" in _records(out_path)[0]
+
+def test_system_prompt_is_not_shared_between_calls(tmp_path):
+    client = _fake_client([_schema(), _schema()])
+
+    asyncio.run(pipeline.run_pipeline(
+        ["Studio. $1200/mo.", "2 Bed 1 Bath. $1850 per month."], str(tmp_path / "out.jsonl"),
+        use_cache=False, client=client,
+    ))
+
+    assert client.chat.completions.system_prompts == [pipeline.SYSTEM_PROMPT] * 2